@@ -16,7 +16,6 @@
 # limitations under the License.
 #
 import unittest
-import difflib
 from itertools import zip_longest
 
 from pyspark.errors import QueryContextType
@@ -29,7 +28,12 @@ from pyspark.errors import (
     SparkUpgradeException,
     PySparkTypeError,
 )
-from pyspark.testing.utils import assertDataFrameEqual, assertSchemaEqual, _context_diff, have_numpy
+from pyspark.testing.utils import (
+    assertDataFrameEqual,
+    assertSchemaEqual,
+    _context_diff,
+    have_numpy,
+)
 from pyspark.testing.sqlutils import ReusedSQLTestCase
 from pyspark.sql import Row
 import pyspark.sql.functions as F
@@ -1197,9 +1201,13 @@ class UtilsTestsMixin:
             schema=["id", "amount"],
         )
 
-        generated_diff = difflib.ndiff(str(df1.schema).splitlines(), str(df2.schema).splitlines())
-
-        expected_error_msg = "\n".join(generated_diff)
+        expected_error_msg = (
+            "@@ -1,2 +1,2 @@\n"
+            "-id: bigint nullable\n"
+            "-number: bigint nullable\n"
+            "+id: string nullable\n"
+            "+amount: bigint nullable"
+        )
 
         with self.assertRaises(PySparkAssertionError) as pe:
             assertDataFrameEqual(df1, df2)
@@ -1227,9 +1235,12 @@ class UtilsTestsMixin:
             schema=["id", "amount", "letter"],
         )
 
-        generated_diff = difflib.ndiff(str(df1.schema).splitlines(), str(df2.schema).splitlines())
-
-        expected_error_msg = "\n".join(generated_diff)
+        expected_error_msg = (
+            "@@ -1,2 +1,3 @@\n"
+            " id: bigint nullable\n"
+            " amount: bigint nullable\n"
+            "+letter: string nullable"
+        )
 
         with self.assertRaises(PySparkAssertionError) as pe:
             assertDataFrameEqual(df1, df2)
@@ -1255,9 +1266,22 @@ class UtilsTestsMixin:
 
         assertDataFrameEqual(df1, df2)
 
-        with self.assertRaises(PySparkAssertionError):
+        with self.assertRaises(PySparkAssertionError) as pe:
             assertDataFrameEqual(df1, df2, ignoreNullable=False)
 
+        self.check_error(
+            exception=pe.exception,
+            errorClass="DIFFERENT_SCHEMA",
+            messageParameters={
+                "error_msg": (
+                    "@@ -1,2 +1,2 @@\n"
+                    " id: int nullable\n"
+                    "-name: string nullable\n"
+                    "+name: string not null"
+                )
+            },
+        )
+
     def test_schema_ignore_nullable_array_equal(self):
         s1 = StructType([StructField("names", ArrayType(DoubleType(), True), True)])
         s2 = StructType([StructField("names", ArrayType(DoubleType(), False), False)])
@@ -1273,13 +1297,36 @@ class UtilsTestsMixin:
         )
         assertSchemaEqual(s1, s2)
 
+    def test_schema_ignore_nullable_map_equal(self):
+        s1 = StructType([StructField("m", MapType(StringType(), IntegerType(), True), True)])
+        s2 = StructType([StructField("m", MapType(StringType(), IntegerType(), False), False)])
+
+        assertSchemaEqual(s1, s2)
+
+    def test_schema_map_unequal(self):
+        s1 = StructType([StructField("m", MapType(StringType(), IntegerType(), True), True)])
+        s2 = StructType([StructField("m", MapType(IntegerType(), IntegerType(), True), True)])
+
+        expected_error_msg = (
+            "@@ -1 +1 @@\n" "-m: map<string,int> nullable\n" "+m: map<int,int> nullable"
+        )
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertSchemaEqual(s1, s2)
+
+        self.check_error(
+            exception=pe.exception,
+            errorClass="DIFFERENT_SCHEMA",
+            messageParameters={"error_msg": expected_error_msg},
+        )
+
     def test_schema_array_unequal(self):
         s1 = StructType([StructField("names", ArrayType(IntegerType(), True), True)])
         s2 = StructType([StructField("names", ArrayType(DoubleType(), False), False)])
 
-        generated_diff = difflib.ndiff(str(s1).splitlines(), str(s2).splitlines())
-
-        expected_error_msg = "\n".join(generated_diff)
+        expected_error_msg = (
+            "@@ -1 +1 @@\n" "-names: array<int> nullable\n" "+names: array<double> not null"
+        )
 
         with self.assertRaises(PySparkAssertionError) as pe:
             assertSchemaEqual(s1, s2)
@@ -1298,9 +1345,11 @@ class UtilsTestsMixin:
             [StructField("names", StructType([StructField("age", IntegerType(), True)]), True)]
         )
 
-        generated_diff = difflib.ndiff(str(s1).splitlines(), str(s2).splitlines())
-
-        expected_error_msg = "\n".join(generated_diff)
+        expected_error_msg = (
+            "@@ -1 +1 @@\n"
+            "-names: struct<age:double> nullable\n"
+            "+names: struct<age:int> nullable"
+        )
 
         with self.assertRaises(PySparkAssertionError) as pe:
             assertSchemaEqual(s1, s2)
@@ -1342,9 +1391,11 @@ class UtilsTestsMixin:
             ]
         )
 
-        generated_diff = difflib.ndiff(str(s1).splitlines(), str(s2).splitlines())
-
-        expected_error_msg = "\n".join(generated_diff)
+        expected_error_msg = (
+            "@@ -1 +1 @@\n"
+            "-name: struct<firstname:string,middlename:string,lastname:string> nullable\n"
+            "+name: struct<firstname:string,middlename:boolean,lastname:string> nullable"
+        )
 
         with self.assertRaises(PySparkAssertionError) as pe:
             assertSchemaEqual(s1, s2)
@@ -1355,6 +1406,58 @@ class UtilsTestsMixin:
             messageParameters={"error_msg": expected_error_msg},
         )
 
+    def test_schema_metadata_unequal(self):
+        s1 = StructType([StructField("id", IntegerType(), True, {"comment": "a"})])
+        s2 = StructType([StructField("id", IntegerType(), True, {"comment": "b"})])
+
+        expected_error_msg = (
+            "@@ -1 +1 @@\n"
+            '-{"metadata": {"comment": "a"}, "name": "id", "nullable": true, "type": "integer"}\n'
+            '+{"metadata": {"comment": "b"}, "name": "id", "nullable": true, "type": "integer"}'
+        )
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertSchemaEqual(s1, s2, ignoreNullable=False)
+
+        self.check_error(
+            exception=pe.exception,
+            errorClass="DIFFERENT_SCHEMA",
+            messageParameters={"error_msg": expected_error_msg},
+        )
+
+        df1 = self.spark.createDataFrame([(1,)], s1)
+        df2 = self.spark.createDataFrame([(1,)], s2)
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertDataFrameEqual(df1, df2, ignoreNullable=False)
+
+        self.check_error(
+            exception=pe.exception,
+            errorClass="DIFFERENT_SCHEMA",
+            messageParameters={"error_msg": expected_error_msg},
+        )
+
+    def test_schema_nested_nullable_unequal(self):
+        s1 = StructType([StructField("names", ArrayType(IntegerType(), True), True)])
+        s2 = StructType([StructField("names", ArrayType(IntegerType(), False), True)])
+
+        expected_error_msg = (
+            "@@ -1 +1 @@\n"
+            '-{"metadata": {}, "name": "names", "nullable": true, '
+            '"type": {"containsNull": true, "elementType": "integer", "type": "array"}}\n'
+            '+{"metadata": {}, "name": "names", "nullable": true, '
+            '"type": {"containsNull": false, "elementType": "integer", "type": "array"}}'
+        )
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertSchemaEqual(s1, s2, ignoreNullable=False)
+
+        self.check_error(
+            exception=pe.exception,
+            errorClass="DIFFERENT_SCHEMA",
+            messageParameters={"error_msg": expected_error_msg},
+        )
+
     def test_schema_unsupported_type(self):
         s1 = "names: int"
         s2 = "names: int"
@@ -1454,6 +1557,90 @@ class UtilsTestsMixin:
         assertDataFrameEqual(df1, df2, checkRowOrder=False)
         assertDataFrameEqual(df1, df2, checkRowOrder=True)
 
+    def test_assert_equal_no_tolerance(self):
+        df1 = self.spark.createDataFrame(
+            data=[(1, 1.0, [1, 2]), (2, float("nan"), [3]), (2, 3.0, [3])],
+            schema=["id", "amount", "values"],
+        )
+        df2 = self.spark.createDataFrame(
+            data=[(2, 3.0, [3]), (1, 1.0, [1, 2]), (2, float("nan"), [3])],
+            schema=["id", "amount", "values"],
+        )
+        df3 = self.spark.createDataFrame(
+            data=[(1, 1.0, [1, 2]), (2, float("nan"), [3]), (2, 3.0000001, [3])],
+            schema=["id", "amount", "values"],
+        )
+
+        assertDataFrameEqual(df1, df2, atol=0, rtol=0)
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertDataFrameEqual(df1, df3, atol=0, rtol=0)
+
+        self.assertEqual(pe.exception.getErrorClass(), "DIFFERENT_ROWS")
+
+    def test_assert_unordered_sorted_on_jvm(self):
+        df1 = self.spark.createDataFrame(
+            [(i, float(i)) for i in range(100)], ["id", "amount"]
+        ).repartition(4)
+        df2 = self.spark.createDataFrame(
+            [(i, float(i) + 1e-9) for i in reversed(range(100))], ["id", "amount"]
+        )
+        df3 = self.spark.createDataFrame(
+            [(i, float(i) + (1.0 if i == 5 else 0.0)) for i in range(100)], ["id", "amount"]
+        )
+
+        assertDataFrameEqual(df1, df2)
+
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertDataFrameEqual(df1, df3)
+
+        self.assertEqual(pe.exception.getErrorClass(), "DIFFERENT_ROWS")
+
+        # column names with dots or backticks are sorted as top-level columns
+        df4 = self.spark.createDataFrame([(2, 1), (1, 2)], ["a.b", "c`d"])
+        df5 = self.spark.createDataFrame([(1, 2), (2, 1)], ["a.b", "c`d"])
+
+        assertDataFrameEqual(df4, df5)
+
+        # duplicate column names cannot be sorted by, the rows are sorted on the driver
+        df6 = self.spark.createDataFrame([(2, 1), (1, 2)]).toDF("a", "a")
+        df7 = self.spark.createDataFrame([(1, 2), (2, 1)]).toDF("a", "a")
+
+        assertDataFrameEqual(df6, df7)
+
+    def test_assert_unordered_collated_strings(self):
+        schema = StructType([StructField("s", StringType("UTF8_LCASE"))])
+        df1 = self.spark.createDataFrame([("A",), ("a",)], schema)
+        df2 = self.spark.createDataFrame([("a",), ("A",)], schema)
+
+        # "A" and "a" are ties when sorted by Spark under UTF8_LCASE
+        assertDataFrameEqual(df1, df2)
+
+        nested_schema = StructType([StructField("s", ArrayType(StringType("UTF8_LCASE")))])
+        df3 = self.spark.createDataFrame([(["A"],), (["a"],)], nested_schema)
+        df4 = self.spark.createDataFrame([(["a"],), (["A"],)], nested_schema)
+
+        assertDataFrameEqual(df3, df4)
+
+        # only the expected side is collated
+        df5 = self.spark.createDataFrame(
+            [("A",), ("a",)], StructType([StructField("s", StringType())])
+        )
+
+        assertDataFrameEqual(df5, df2)
+
+    def test_assert_equal_no_tolerance_collated_strings(self):
+        df1 = self.spark.createDataFrame(
+            [("A",), ("a",)], StructType([StructField("s", StringType())])
+        )
+        df2 = self.spark.createDataFrame(
+            [("a",), ("A",)], StructType([StructField("s", StringType("UTF8_LCASE"))])
+        )
+
+        # the collations differ, so the rows cannot be compared with set operations
+        assertDataFrameEqual(df1, df2, atol=0, rtol=0)
+        assertDataFrameEqual(df2, df1, atol=0, rtol=0)
+
     def test_special_vals(self):
         df1 = self.spark.createDataFrame(
             data=[
@@ -1680,6 +1867,34 @@ class UtilsTestsMixin:
 
         assertDataFrameEqual(df1, df2, ignoreColumnType=True)
 
+    def test_list_row_ignore_column_options(self):
+        list1 = [Row(A=1, B=2), Row(A=3, B=4)]
+        list2 = [Row(A=1, B=2), Row(A=3, B=4)]
+
+        assertDataFrameEqual(
+            list1, list2, ignoreColumnOrder=True, ignoreColumnName=True, ignoreColumnType=True
+        )
+
+    def test_dataframe_list_row_ignore_column_options(self):
+        df = self.spark.createDataFrame([(1, 2), (3, 4)], ["A", "B"])
+        list_rows = [Row(A=1, B=2), Row(A=3, B=4)]
+
+        assertDataFrameEqual(df, list_rows)
+
+        for option in ("ignoreColumnOrder", "ignoreColumnName", "ignoreColumnType"):
+            for actual, expected in ((df, list_rows), (list_rows, df)):
+                with self.assertRaises(PySparkAssertionError) as pe:
+                    assertDataFrameEqual(actual, expected, **{option: True})
+
+                self.check_error(
+                    exception=pe.exception,
+                    errorClass="UNSUPPORTED_OPERATION",
+                    messageParameters={
+                        "operation": "ignoreColumnOrder, ignoreColumnName or ignoreColumnType "
+                        "with a DataFrame and a list of Rows"
+                    },
+                )
+
     def test_dataframe_max_errors(self):
         df1 = self.spark.createDataFrame([(1, "a"), (2, "b"), (3, "c"), (4, "d")], ["id", "value"])
         df2 = self.spark.createDataFrame([(1, "a"), (2, "z"), (3, "x"), (4, "y")], ["id", "value"])
@@ -1802,6 +2017,19 @@ class UtilsTestsMixin:
 
         self.assertTrue(exception_thrown)
 
+        with self.assertRaises(PySparkAssertionError) as pe:
+            assertDataFrameEqual(df1, df1)
+
+        self.assertEqual(pe.exception.getErrorClass(), "UNSUPPORTED_OPERATION")
+
+    def test_assert_equal_same_object(self):
+        df = self.spark.createDataFrame([(1, float("nan")), (2, 3.0)], schema=["id", "amount"])
+        rows = df.collect()
+
+        assertDataFrameEqual(df, df)
+        assertDataFrameEqual(rows, rows, checkRowOrder=True)
+        assertDataFrameEqual([], [])
+
 
 class UtilsTests(ReusedSQLTestCase, UtilsTestsMixin):
     pass
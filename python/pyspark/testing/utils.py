@@ -15,16 +15,20 @@
 # limitations under the License.
 #
 
-import glob
 import os
 import struct
 import sys
 import unittest
 import difflib
 import functools
+import itertools
+import json
 import math
+import operator
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
-from time import time, sleep
+from time import monotonic, sleep
 from typing import (
     Any,
     Optional,
@@ -32,6 +36,7 @@ from typing import (
     Dict,
     List,
     Callable,
+    NamedTuple,
 )
 from itertools import zip_longest
 
@@ -59,8 +64,35 @@ from pyspark.errors.exceptions.base import QueryContextType
 from pyspark.find_spark_home import _find_spark_home
 from pyspark.sql.dataframe import DataFrame
 from pyspark.sql import Row
-from pyspark.sql.types import StructType, StructField
+from pyspark.sql.types import (
+    ArrayType,
+    BinaryType,
+    BooleanType,
+    ByteType,
+    CharType,
+    DateType,
+    DayTimeIntervalType,
+    DecimalType,
+    DoubleType,
+    FloatType,
+    IntegerType,
+    LongType,
+    MapType,
+    NullType,
+    ShortType,
+    StringType,
+    StructType,
+    StructField,
+    TimestampNTZType,
+    TimestampType,
+    UserDefinedType,
+    VarcharType,
+    VariantType,
+)
+from pyspark.sql.column import Column
 from pyspark.sql.functions import col, when
+from pyspark.sql.utils import is_remote
+from pyspark.util import inheritable_thread_target
 
 
 __all__ = ["assertDataFrameEqual", "assertSchemaEqual"]
@@ -69,16 +101,19 @@ SPARK_HOME = _find_spark_home()
 
 
 def read_int(b):
-    return struct.unpack("!i", b)[0]
+    if len(b) != 4:
+        raise struct.error("unpack requires a buffer of 4 bytes")
+    return int.from_bytes(b, "big", signed=True)
 
 
 def write_int(i):
-    return struct.pack("!i", i)
+    return i.to_bytes(4, "big", signed=True)
 
 
 def eventually(
     timeout=30.0,
     catch_assertions=False,
+    verbose=False,
 ):
     """
     Wait a given amount of time for a condition to pass, else fail with an error.
@@ -100,19 +135,24 @@ def eventually(
         If False (default), do not catch AssertionErrors.
         If True, catch AssertionErrors; continue, but save
         error to throw upon timeout.
+    verbose : bool
+        If True, print the value returned by each failed attempt.
+        If False (default), only the last value is reported upon timeout.
     """
     assert timeout > 0
     assert isinstance(catch_assertions, bool)
+    assert isinstance(verbose, bool)
 
     def decorator(condition: Callable) -> Callable:
         assert isinstance(condition, Callable)
 
         @functools.wraps(condition)
         def wrapper(*args: Any, **kwargs: Any) -> Any:
-            start_time = time()
+            deadline = monotonic() + timeout
+            delay = 0.001
             lastValue = None
             numTries = 0
-            while time() - start_time < timeout:
+            while monotonic() < deadline:
                 numTries += 1
 
                 if catch_assertions:
@@ -126,15 +166,18 @@ def eventually(
                 if lastValue is True or lastValue is None:
                     return
 
-                print(f"\nAttempt #{numTries} failed!\n{lastValue}")
-                sleep(0.01)
+                if verbose:
+                    print(f"\nAttempt #{numTries} failed!\n{lastValue}")
+                # back off exponentially, capped so slow conditions are still polled regularly
+                sleep(delay)
+                delay = min(delay * 2, 0.1)
 
             if isinstance(lastValue, AssertionError):
                 raise lastValue
             else:
                 raise AssertionError(
-                    "Test failed due to timeout after %g sec, with last condition returning: %s"
-                    % (timeout, lastValue)
+                    f"Test failed due to timeout after {timeout:g} sec, "
+                    f"with last condition returning: {lastValue}"
                 )
 
         return wrapper
@@ -145,13 +188,16 @@ def eventually(
 class QuietTest:
     def __init__(self, sc):
         self.log4j = sc._jvm.org.apache.log4j
+        # resolve the JVM handles once so entering and exiting only call into the root logger
+        self._root_logger = self.log4j.LogManager.getRootLogger()
+        self._fatal = self.log4j.Level.FATAL
 
     def __enter__(self):
-        self.old_level = self.log4j.LogManager.getRootLogger().getLevel()
-        self.log4j.LogManager.getRootLogger().setLevel(self.log4j.Level.FATAL)
+        self.old_level = self._root_logger.getLevel()
+        self._root_logger.setLevel(self._fatal)
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.log4j.LogManager.getRootLogger().setLevel(self.old_level)
+        self._root_logger.setLevel(self.old_level)
 
 
 class PySparkTestCase(unittest.TestCase):
@@ -201,28 +247,55 @@ class ByteArrayOutput:
         self.buffer = bytearray()
 
     def write(self, b):
-        self.buffer += b
+        # accepts any bytes-like object, including memoryview, without an intermediate copy
+        self.buffer.extend(b)
 
     def close(self):
         pass
 
 
+# We should ignore the following jars
+_IGNORED_JAR_SUFFIXES = ("javadoc.jar", "sources.jar", "test-sources.jar", "tests.jar")
+
+
+def _find_jars(target_path, sbt_jar_name_prefix, mvn_jar_name_prefix):
+    # Equivalent to globbing "target/scala-*/<sbt prefix>*.jar" and "target/<mvn prefix>*.jar",
+    # but lists the target directory only once.
+    def is_jar(name, prefix):
+        return (
+            name.startswith(prefix)
+            and name.endswith(".jar")
+            and not name.endswith(_IGNORED_JAR_SUFFIXES)
+        )
+
+    sbt_build = []
+    maven_build = []
+    try:
+        with os.scandir(target_path) as entries:
+            for entry in entries:
+                if entry.name.startswith("scala-") and entry.is_dir():
+                    with os.scandir(entry.path) as scala_entries:
+                        sbt_build.extend(
+                            e.path for e in scala_entries if is_jar(e.name, sbt_jar_name_prefix)
+                        )
+                elif is_jar(entry.name, mvn_jar_name_prefix):
+                    maven_build.append(entry.path)
+    except OSError:
+        # the project has not been built
+        return []
+    return sbt_build + maven_build
+
+
 def search_jar(project_relative_path, sbt_jar_name_prefix, mvn_jar_name_prefix):
     # Note that 'sbt_jar_name_prefix' and 'mvn_jar_name_prefix' are used since the prefix can
     # vary for SBT or Maven specifically. See also SPARK-26856
     project_full_path = os.path.join(SPARK_HOME, project_relative_path)
 
-    # We should ignore the following jars
-    ignored_jar_suffixes = ("javadoc.jar", "sources.jar", "test-sources.jar", "tests.jar")
-
     # Search jar in the project dir using the jar name_prefix for both sbt build and maven
     # build because the artifact jars are in different directories.
-    sbt_build = glob.glob(
-        os.path.join(project_full_path, "target/scala-*/%s*.jar" % sbt_jar_name_prefix)
+    jars = _find_jars(
+        os.path.join(project_full_path, "target"), sbt_jar_name_prefix, mvn_jar_name_prefix
     )
-    maven_build = glob.glob(os.path.join(project_full_path, "target/%s*.jar" % mvn_jar_name_prefix))
-    jar_paths = sbt_build + maven_build
-    jars = [jar for jar in jar_paths if not jar.endswith(ignored_jar_suffixes)]
 
     if not jars:
         return None
@@ -232,13 +305,27 @@ def search_jar(project_relative_path, sbt_jar_name_prefix, mvn_jar_name_prefix):
         return jars[0]
 
 
-def _terminal_color_support():
+_COLOR_TERMS = frozenset(["xterm", "xterm-256color", "screen", "tmux", "linux"])
+
+
+@functools.lru_cache(maxsize=1)
+def _terminal_color_support() -> bool:
+    # determine if environment supports color, resolved once per process
+    if os.environ.get("NO_COLOR") or os.environ.get("TERM") == "dumb":
+        return False
     try:
-        # determine if environment supports color
-        script = "$(test $(tput colors)) && $(test $(tput colors) -ge 8) && echo true || echo false"
-        return os.popen(script).read()
+        if not sys.stdout.isatty():
+            return False
     except Exception:
         return False
+    try:
+        import curses
+
+        curses.setupterm()
+        return curses.tigetnum("colors") >= 8
+    except Exception:
+        # curses is unavailable (e.g. on Windows) or the terminal is unknown to terminfo
+        return os.environ.get("TERM", "") in _COLOR_TERMS
 
 
 def _context_diff(actual: List[str], expected: List[str], n: int = 3):
@@ -247,32 +334,42 @@ def _context_diff(actual: List[str], expected: List[str], n: int = 3):
     see original code here: https://github.com/python/cpython/blob/main/Lib/difflib.py#L1180
     """
 
-    def red(s: str) -> str:
+    # resolve the per-tag line decoration once, changed lines are shown in red if supported
+    prefix = dict(insert="+ ", delete="- ", replace="! ", equal="  ")
+    suffix = dict.fromkeys(prefix, "")
+    if _terminal_color_support():
         red_color = "\033[31m"
         no_color = "\033[0m"
-        return red_color + str(s) + no_color
+        for tag in ("insert", "delete", "replace"):
+            prefix[tag] = red_color + prefix[tag]
+            suffix[tag] = no_color
 
-    prefix = dict(insert="+ ", delete="- ", replace="! ", equal="  ")
     for group in difflib.SequenceMatcher(None, actual, expected).get_grouped_opcodes(n):
+        # find out in one pass whether each side has any changed lines
+        has_actual = has_expected = False
+        for tag, _, _, _, _ in group:
+            if tag in ("replace", "delete"):
+                has_actual = True
+            if tag in ("replace", "insert"):
+                has_expected = True
+            if has_actual and has_expected:
+                break
+
         yield "*** actual ***"
-        if any(tag in {"replace", "delete"} for tag, _, _, _, _ in group):
+        if has_actual:
             for tag, i1, i2, _, _ in group:
+                start, end = prefix[tag], suffix[tag]
                 for line in actual[i1:i2]:
-                    if tag != "equal" and _terminal_color_support():
-                        yield red(prefix[tag] + str(line))
-                    else:
-                        yield prefix[tag] + str(line)
+                    yield f"{start}{line}{end}"
 
         yield "\n"
 
         yield "*** expected ***"
-        if any(tag in {"replace", "insert"} for tag, _, _, _, _ in group):
+        if has_expected:
             for tag, _, _, j1, j2 in group:
+                start, end = prefix[tag], suffix[tag]
                 for line in expected[j1:j2]:
-                    if tag != "equal" and _terminal_color_support():
-                        yield red(prefix[tag] + str(line))
-                    else:
-                        yield prefix[tag] + str(line)
+                    yield f"{start}{line}{end}"
 
 
 class PySparkErrorTestUtils:
@@ -294,47 +391,144 @@ class PySparkErrorTestUtils:
             "`query_context_type` is required when QueryContext exists. "
             f"QueryContext: {query_context}."
         )
+        # The failure messages below are only formatted when the check fails.
         # Test if given error is an instance of PySparkException.
-        self.assertIsInstance(
-            exception,
-            PySparkException,
-            f"checkError requires 'PySparkException', got '{exception.__class__.__name__}'.",
-        )
+        if not isinstance(exception, PySparkException):
+            self.assertIsInstance(
+                exception,
+                PySparkException,
+                f"checkError requires 'PySparkException', got '{exception.__class__.__name__}'.",
+            )
 
         # Test error class
         expected = errorClass
         actual = exception.getErrorClass()
-        self.assertEqual(
-            expected, actual, f"Expected error class was '{expected}', got '{actual}'."
-        )
+        if expected != actual:
+            self.assertEqual(
+                expected, actual, f"Expected error class was '{expected}', got '{actual}'."
+            )
 
         # Test message parameters
         expected = messageParameters
         actual = exception.getMessageParameters()
-        self.assertEqual(
-            expected, actual, f"Expected message parameters was '{expected}', got '{actual}'"
-        )
+        if expected != actual:
+            self.assertEqual(
+                expected, actual, f"Expected message parameters was '{expected}', got '{actual}'"
+            )
 
         # Test query context
         if query_context:
             expected = query_context_type
-            actual_contexts = exception.getQueryContext()
-            for actual_context in actual_contexts:
+            for actual_context in query_context:
                 actual = actual_context.contextType()
-                self.assertEqual(
-                    expected, actual, f"Expected QueryContext was '{expected}', got '{actual}'"
-                )
+                if expected != actual:
+                    self.assertEqual(
+                        expected, actual, f"Expected QueryContext was '{expected}', got '{actual}'"
+                    )
                 if actual == QueryContextType.DataFrame:
                     assert (
                         fragment is not None
                     ), "`fragment` is required when QueryContextType is DataFrame."
                     expected = fragment
                     actual = actual_context.fragment()
-                    self.assertEqual(
-                        expected,
-                        actual,
-                        f"Expected PySpark fragment was '{expected}', got '{actual}'",
-                    )
+                    if expected != actual:
+                        self.assertEqual(
+                            expected,
+                            actual,
+                            f"Expected PySpark fragment was '{expected}', got '{actual}'",
+                        )
+
+
+def _schema_key(
+    dt: Any, ignore_nullable: bool, ignore_order: bool = False, ignore_name: bool = False
+) -> tuple:
+    """
+    Flattens a data type into a nested tuple so that two schemas can be compared with a
+    single `==`. Nullability is left out of the key when `ignore_nullable` is set.
+    `ignore_order` sorts the fields of a top-level struct by name and `ignore_name` replaces
+    their names by their positions, mirroring `ignoreColumnOrder` and `ignoreColumnName`.
+    """
+    if isinstance(dt, StructType):
+        fields = sorted(dt.fields, key=lambda f: f.name) if ignore_order else dt.fields
+        return (
+            "struct",
+            tuple(
+                (
+                    i if ignore_name else f.name,
+                    _schema_key(f.dataType, ignore_nullable),
+                    None if ignore_nullable else f.nullable,
+                )
+                for i, f in enumerate(fields)
+            ),
+        )
+    elif isinstance(dt, ArrayType):
+        return (
+            "array",
+            _schema_key(dt.elementType, ignore_nullable),
+            None if ignore_nullable else dt.containsNull,
+        )
+    elif isinstance(dt, MapType):
+        return (
+            "map",
+            _schema_key(dt.keyType, ignore_nullable),
+            _schema_key(dt.valueType, ignore_nullable),
+            None if ignore_nullable else dt.valueContainsNull,
+        )
+    else:
+        # atomic types are equal when they are of the same class
+        return (type(dt),)
+
+
+def _schemas_equal(
+    actual: StructType,
+    expected: StructType,
+    ignore_nullable: bool,
+    ignore_order: bool = False,
+    ignore_name: bool = False,
+) -> bool:
+    if ignore_nullable:
+        return _schema_key(actual, True, ignore_order, ignore_name) == _schema_key(
+            expected, True, ignore_order, ignore_name
+        )
+    elif not ignore_order and not ignore_name:
+        return actual == expected
+
+    actual_fields = sorted(actual.fields, key=lambda f: f.name) if ignore_order else actual.fields
+    expected_fields = (
+        sorted(expected.fields, key=lambda f: f.name) if ignore_order else expected.fields
+    )
+    if ignore_name:
+        # renamed columns only keep their data type and nullability
+        return [(f.dataType, f.nullable) for f in actual_fields] == [
+            (f.dataType, f.nullable) for f in expected_fields
+        ]
+    else:
+        return actual_fields == expected_fields
+
+
+def _schema_diff(actual: StructType, expected: StructType) -> str:
+    """
+    Builds a diff of two schemas with one line per top-level field.
+    """
+
+    def field_lines(schema: StructType) -> List[str]:
+        return [
+            f"{f.name}: {f.dataType.simpleString()} {'nullable' if f.nullable else 'not null'}"
+            for f in schema
+        ]
+
+    actual_lines = field_lines(actual)
+    expected_lines = field_lines(expected)
+    if actual_lines == expected_lines:
+        # the difference is not visible in the simple strings (e.g. nested nullability or
+        # metadata), show the JSON of each field, which has all of its properties
+        actual_lines = [json.dumps(f.jsonValue(), sort_keys=True) for f in actual]
+        expected_lines = [json.dumps(f.jsonValue(), sort_keys=True) for f in expected]
+    # skip the "---"/"+++" file headers, the error message template already has them
+    generated_diff = itertools.islice(
+        difflib.unified_diff(actual_lines, expected_lines, lineterm=""), 2, None
+    )
+    return "\n".join(generated_diff)
 
 
 def assertSchemaEqual(
@@ -384,7 +578,7 @@ def assertSchemaEqual(
     Notes
     -----
     When assertSchemaEqual fails, the error message uses the Python `difflib` library to display
-    a diff log of the `actual` and `expected` schemas.
+    a diff log of the `actual` and `expected` schemas, with one line per top-level field.
 
     Examples
     --------
@@ -402,11 +596,9 @@ def assertSchemaEqual(
     PySparkAssertionError: [DIFFERENT_SCHEMA] Schemas do not match.
     --- actual
     +++ expected
-    - StructType([StructField('names', ArrayType(DoubleType(), True), True)])
-    ?                                                                 ^^^
-    + StructType([StructField('names', ArrayType(DoubleType(), True), False)])
-    ?                                                                 ^^^^
-
+    @@ -1 +1 @@
+    -names: array<double> nullable
+    +names: array<double> not null
 
     >>> df1 = spark.createDataFrame(data=[(1, 1000), (2, 3000)], schema=["id", "number"])
     >>> df2 = spark.createDataFrame(data=[("1", 1000), ("2", 5000)], schema=["id", "amount"])
@@ -416,10 +608,11 @@ def assertSchemaEqual(
     PySparkAssertionError: [DIFFERENT_SCHEMA] Schemas do not match.
     --- actual
     +++ expected
-    - StructType([StructField('id', LongType(), True), StructField('number', LongType(), True)])
-    ?                               ^^                               ^^^^^
-    + StructType([StructField('id', StringType(), True), StructField('amount', LongType(), True)])
-    ?                               ^^^^                              ++++ ^
+    @@ -1,2 +1,2 @@
+    -id: bigint nullable
+    -number: bigint nullable
+    +id: string nullable
+    +amount: bigint nullable
 
     Compare two schemas ignoring the column order.
 
@@ -452,37 +645,12 @@ def assertSchemaEqual(
             messageParameters={"arg_name": "expected", "arg_type": type(expected).__name__},
         )
 
-    def compare_schemas_ignore_nullable(s1: StructType, s2: StructType):
-        if len(s1) != len(s2):
-            return False
-        zipped = zip_longest(s1, s2)
-        for sf1, sf2 in zipped:
-            if not compare_structfields_ignore_nullable(sf1, sf2):
-                return False
-        return True
-
-    def compare_structfields_ignore_nullable(actualSF: StructField, expectedSF: StructField):
-        if actualSF is None and expectedSF is None:
-            return True
-        elif actualSF is None or expectedSF is None:
-            return False
-        if actualSF.name != expectedSF.name:
-            return False
-        else:
-            return compare_datatypes_ignore_nullable(actualSF.dataType, expectedSF.dataType)
-
-    def compare_datatypes_ignore_nullable(dt1: Any, dt2: Any):
-        # checks datatype equality, using recursion to ignore nullable
-        if dt1.typeName() == dt2.typeName():
-            if dt1.typeName() == "array":
-                return compare_datatypes_ignore_nullable(dt1.elementType, dt2.elementType)
-            elif dt1.typeName() == "struct":
-                return compare_schemas_ignore_nullable(dt1, dt2)
-            else:
-                return True
-        else:
-            return False
+    if actual is expected or _schemas_equal(
+        actual, expected, ignoreNullable, ignoreColumnOrder, ignoreColumnName
+    ):
+        return
 
+    # Only normalize the schemas to render the diff for the failure
     if ignoreColumnOrder:
         actual = StructType(sorted(actual, key=lambda x: x.name))
         expected = StructType(sorted(expected, key=lambda x: x.name))
@@ -498,15 +666,10 @@ def assertSchemaEqual(
             ]
         )
 
-    if (ignoreNullable and not compare_schemas_ignore_nullable(actual, expected)) or (
-        not ignoreNullable and actual != expected
-    ):
-        generated_diff = difflib.ndiff(str(actual).splitlines(), str(expected).splitlines())
-        error_msg = "\n".join(generated_diff)
-        raise PySparkAssertionError(
-            errorClass="DIFFERENT_SCHEMA",
-            messageParameters={"error_msg": error_msg},
-        )
+    raise PySparkAssertionError(
+        errorClass="DIFFERENT_SCHEMA",
+        messageParameters={"error_msg": _schema_diff(actual, expected)},
+    )
 
 
 from typing import TYPE_CHECKING
@@ -516,6 +679,202 @@ if TYPE_CHECKING:
     import pyspark.pandas
 
 
+@functools.lru_cache(maxsize=1)
+def _get_pandas_utils():
+    """
+    Returns the pandas and pandas-on-Spark modules together with a shared
+    `PandasOnSparkTestUtils` instance, or None if pandas or PyArrow is not installed.
+    The imports are resolved once per process.
+    """
+    try:
+        # If pandas dependencies are available, allow pandas or pandas-on-Spark DataFrame
+        import pandas as pd
+        import pyarrow  # noqa: F401
+    except ImportError:
+        # no pandas, so we won't call pandasutils functions
+        return None
+
+    import pyspark.pandas as ps
+    from pyspark.testing.pandasutils import PandasOnSparkTestUtils
+
+    return pd, ps, PandasOnSparkTestUtils()
+
+
+def _supports_exact_jvm_comparison(dt: Any) -> bool:
+    """
+    Whether Spark set operations such as `exceptAll` and sorts match and order values of `dt`
+    exactly the way `assertDataFrameEqual` compares them without tolerances.
+    """
+    if isinstance(dt, StructType):
+        return all(_supports_exact_jvm_comparison(f.dataType) for f in dt.fields)
+    elif isinstance(dt, ArrayType):
+        return _supports_exact_jvm_comparison(dt.elementType)
+    elif isinstance(dt, StringType):
+        # non-binary collations consider different strings equal, and sort them as ties
+        return dt.collation == "UTF8_BINARY"
+    else:
+        # maps, variants and user-defined types are not supported by set operations and sorts
+        return not isinstance(dt, (MapType, VariantType, UserDefinedType))
+
+
+def _quoted_col(name: str) -> Column:
+    """
+    Returns the top-level column `name`, quoted so that e.g. dots are not read as nested fields.
+    """
+    return col("`" + name.replace("`", "``") + "`")
+
+
+class _Tolerance(NamedTuple):
+    """
+    The `atol` and `rtol` of `assertDataFrameEqual`, also converted to Decimal once per call.
+    """
+
+    atol: float
+    rtol: float
+    decimal_atol: Decimal
+    decimal_rtol: Decimal
+
+
+def _list_value_pairs(val1, val2):
+    return zip(val1, val2) if len(val1) == len(val2) else None
+
+
+def _row_value_pairs(val1, val2):
+    return zip(val1, val2)
+
+
+def _dict_value_pairs(val1, val2):
+    if val1.keys() != val2.keys():
+        return None
+    return ((val1[k], val2[k]) for k in val1)
+
+
+def _compare_floats(val1, val2, tolerance):
+    # written as a negated `>` so that NaN values compare as equal
+    return not abs(val1 - val2) > (tolerance.atol + tolerance.rtol * abs(val2))
+
+
+def _compare_decimals(val1, val2, tolerance):
+    return not abs(val1 - val2) > (tolerance.decimal_atol + tolerance.decimal_rtol * abs(val2))
+
+
+# Nested values are compared element-wise: these return the pairs of elements to compare,
+# or None if the two values cannot be equal, e.g. lists of different lengths
+_NESTED_VALUE_PAIRS = {
+    list: _list_value_pairs,
+    Row: _row_value_pairs,
+    dict: _dict_value_pairs,
+}
+
+_COMPARE_VALS_HANDLERS = {
+    float: _compare_floats,
+    Decimal: _compare_decimals,
+}
+
+
+# Data types whose values collected from a DataFrame are always compared with `==`
+_EQUALITY_COMPARED_TYPES = (
+    NullType,
+    BooleanType,
+    ByteType,
+    ShortType,
+    IntegerType,
+    LongType,
+    StringType,
+    CharType,
+    VarcharType,
+    BinaryType,
+    DateType,
+    TimestampType,
+    TimestampNTZType,
+    DayTimeIntervalType,
+)
+
+
+def _row_values_comparator(schema: StructType, tolerance: _Tolerance, compare_vals: Callable):
+    """
+    Returns a function comparing a Row collected from a DataFrame with `schema` to another
+    value. The comparison used for each column is chosen once from its data type, instead of
+    being looked up for every value.
+    """
+
+    def compare_floats(val1, val2):
+        if val1 is not None and isinstance(val2, float):
+            return _compare_floats(val1, val2, tolerance)
+        return val1 == val2
+
+    def compare_decimals(val1, val2):
+        if val1 is not None and isinstance(val2, Decimal):
+            return _compare_decimals(val1, val2, tolerance)
+        return val1 == val2
+
+    column_comparators = []
+    for field in schema.fields:
+        if isinstance(field.dataType, (FloatType, DoubleType)):
+            column_comparators.append(compare_floats)
+        elif isinstance(field.dataType, DecimalType):
+            column_comparators.append(compare_decimals)
+        elif isinstance(field.dataType, _EQUALITY_COMPARED_TYPES):
+            column_comparators.append(operator.eq)
+        else:
+            column_comparators.append(compare_vals)
+
+    def compare_row_values(r1, r2):
+        if not isinstance(r1, Row) or not isinstance(r2, Row):
+            return compare_vals(r1, r2)
+        return all(compare(x, y) for compare, x, y in zip(column_comparators, r1, r2))
+
+    return compare_row_values
+
+
+@functools.lru_cache(maxsize=1)
+def _collect_executor() -> ThreadPoolExecutor:
+    """
+    Returns the executor running the collects of `assertDataFrameEqual`. It is created once
+    and reused, so its threads and, in pinned thread mode, their Py4J connections are not set
+    up again for every call.
+    """
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="assertDataFrameEqual")
+
+
+def _inheritable_collect(df: DataFrame) -> Callable[[], List[Row]]:
+    """
+    Returns `df.collect` wrapped to run in another thread with the local properties, or the
+    Spark Connect tags, of the calling thread.
+    """
+    if is_remote():
+        return inheritable_thread_target(df.sparkSession)(df.collect)
+    return inheritable_thread_target(df.collect)
+
+
+class _CompareValsHandler(NamedTuple):
+    """
+    How `assertDataFrameEqual` compares values of a type with values of `base`. `func` is one
+    of `_NESTED_VALUE_PAIRS` if `nested` is set, and one of `_COMPARE_VALS_HANDLERS` otherwise.
+    """
+
+    base: type
+    func: Callable
+    nested: bool
+
+
+@functools.lru_cache(maxsize=None)
+def _compare_vals_handler(t: type) -> Optional[_CompareValsHandler]:
+    """
+    Returns the handler used for values of type `t` in `assertDataFrameEqual`, or None if
+    such values are compared with `==`. Subclasses, e.g. `numpy.float64`, resolve to the
+    handler of their base type.
+    """
+    for base in t.__mro__:
+        func = _NESTED_VALUE_PAIRS.get(base)
+        if func is not None:
+            return _CompareValsHandler(base, func, True)
+        func = _COMPARE_VALS_HANDLERS.get(base)
+        if func is not None:
+            return _CompareValsHandler(base, func, False)
+    return None
+
+
 def assertDataFrameEqual(
     actual: Union[DataFrame, "pandas.DataFrame", "pyspark.pandas.DataFrame", List[Row]],
     expected: Union[DataFrame, "pandas.DataFrame", "pyspark.pandas.DataFrame", List[Row]],
@@ -691,10 +1050,10 @@ def assertDataFrameEqual(
     PySparkAssertionError: [DIFFERENT_SCHEMA] Schemas do not match.
     --- actual
     +++ expected
-    - StructType([StructField('amount', LongType(), True), StructField('id', StringType(), True)])
-    ?                                                                                      ^^^
-    + StructType([StructField('amount', LongType(), True), StructField('id', StringType(), False)])
-    ?                                                                                      ^^^^
+    @@ -1,2 +1,2 @@
+     amount: bigint nullable
+    -id: string nullable
+    +id: string not null
 
     Example for ignoreColumnOrder
 
@@ -795,27 +1154,17 @@ def assertDataFrameEqual(
             },
         )
 
-    has_pandas = False
-    try:
-        # If pandas dependencies are available, allow pandas or pandas-on-Spark DataFrame
-        import pandas as pd
-
-        has_pandas = True
-    except ImportError:
-        # no pandas, so we won't call pandasutils functions
-        pass
-
-    has_arrow = False
-    try:
-        import pyarrow
-
-        has_arrow = True
-    except ImportError:
-        pass
+    # trivially equal inputs, checked before any pandas imports or Spark jobs
+    if isinstance(actual, list) and isinstance(expected, list) and not actual and not expected:
+        return True
+    if actual is expected and (
+        isinstance(actual, list) or (isinstance(actual, DataFrame) and not actual.isStreaming)
+    ):
+        return True
 
-    if has_pandas and has_arrow:
-        import pyspark.pandas as ps
-        from pyspark.testing.pandasutils import PandasOnSparkTestUtils
+    pandas_utils = _get_pandas_utils()
+    if pandas_utils is not None:
+        pd, ps, pandas_test_utils = pandas_utils
 
         if (
             isinstance(actual, pd.DataFrame)
@@ -825,7 +1174,7 @@ def assertDataFrameEqual(
         ):
             # handle pandas DataFrames
             # assert approximate equality for float data
-            return PandasOnSparkTestUtils().assert_eq(
+            return pandas_test_utils.assert_eq(
                 actual, expected, almost=True, rtol=rtol, atol=atol, check_row_order=checkRowOrder
             )
 
@@ -848,102 +1197,130 @@ def assertDataFrameEqual(
             },
         )
 
-    if ignoreColumnOrder:
-        actual = actual.select(*sorted(actual.columns))
-        expected = expected.select(*sorted(expected.columns))
-
-    def rename_dataframe_columns(df: DataFrame) -> DataFrame:
-        """Rename DataFrame columns to sequential numbers for comparison"""
-        renamed_columns = [str(i) for i in range(len(df.columns))]
-        return df.toDF(*renamed_columns)
-
-    if ignoreColumnName:
-        actual = rename_dataframe_columns(actual)
-        expected = rename_dataframe_columns(expected)
-
-    def cast_columns_to_string(df: DataFrame) -> DataFrame:
+    def cast_columns_to_string(df: DataFrame, columns: List[str]) -> DataFrame:
         """Cast all DataFrame columns to string for comparison"""
-        for col_name in df.columns:
+        # Build all the casts into a single projection instead of one withColumn per column
+        casts = []
+        for col_name in columns:
+            # Bind each cast once so the same expression is reused in the condition and value
+            as_float = col(col_name).cast("float")
+            as_int = col(col_name).cast("int")
             # Add logic to remove trailing .0 for float columns that are whole numbers
-            df = df.withColumn(
-                col_name,
-                when(
-                    (col(col_name).cast("float").isNotNull())
-                    & (col(col_name).cast("float") == col(col_name).cast("int")),
-                    col(col_name).cast("int").cast("string"),
-                ).otherwise(col(col_name).cast("string")),
+            casts.append(
+                when(as_float.isNotNull() & (as_float == as_int), as_int.cast("string"))
+                .otherwise(col(col_name).cast("string"))
+                .alias(col_name)
             )
-        return df
+        return df.select(*casts)
 
-    if ignoreColumnType:
-        actual = cast_columns_to_string(actual)
-        expected = cast_columns_to_string(expected)
+    ignore_column_options = ignoreColumnOrder or ignoreColumnName or ignoreColumnType
+    if ignore_column_options and isinstance(actual, list) != isinstance(expected, list):
+        # the rows of a list cannot be transformed like the DataFrame on the other side
+        raise PySparkAssertionError(
+            errorClass="UNSUPPORTED_OPERATION",
+            messageParameters={
+                "operation": "ignoreColumnOrder, ignoreColumnName or ignoreColumnType with a "
+                "DataFrame and a list of Rows"
+            },
+        )
 
-    def compare_rows(r1: Row, r2: Row):
-        def compare_vals(val1, val2):
-            if isinstance(val1, list) and isinstance(val2, list):
-                return len(val1) == len(val2) and all(
-                    compare_vals(x, y) for x, y in zip(val1, val2)
-                )
-            elif isinstance(val1, Row) and isinstance(val2, Row):
-                return all(compare_vals(x, y) for x, y in zip(val1, val2))
-            elif isinstance(val1, dict) and isinstance(val2, dict):
-                return (
-                    len(val1.keys()) == len(val2.keys())
-                    and val1.keys() == val2.keys()
-                    and all(compare_vals(val1[k], val2[k]) for k in val1.keys())
-                )
-            elif isinstance(val1, float) and isinstance(val2, float):
-                if abs(val1 - val2) > (atol + rtol * abs(val2)):
-                    return False
-            elif isinstance(val1, Decimal) and isinstance(val2, Decimal):
-                if abs(val1 - val2) > (Decimal(atol) + Decimal(rtol) * abs(val2)):
+    # the column transforms only apply to DataFrames, lists of Rows are compared as they are
+    if ignore_column_options and not isinstance(actual, list):
+        # fetch the column names once and keep them in sync with the transforms below
+        actual_columns = actual.columns
+        expected_columns = expected.columns
+
+        if ignoreColumnOrder:
+            actual_columns = sorted(actual_columns)
+            expected_columns = sorted(expected_columns)
+            actual = actual.select(*actual_columns)
+            expected = expected.select(*expected_columns)
+
+        if ignoreColumnName:
+            # rename columns to sequential numbers for comparison
+            actual_columns = [str(i) for i in range(len(actual_columns))]
+            expected_columns = [str(i) for i in range(len(expected_columns))]
+            actual = actual.toDF(*actual_columns)
+            expected = expected.toDF(*expected_columns)
+
+        if ignoreColumnType:
+            actual = cast_columns_to_string(actual, actual_columns)
+            expected = cast_columns_to_string(expected, expected_columns)
+
+    # the schemas are used several times below, fetch each of them once
+    actual_schema = None if isinstance(actual, list) else actual.schema
+    expected_schema = None if isinstance(expected, list) else expected.schema
+
+    tolerance = _Tolerance(atol, rtol, Decimal(atol), Decimal(rtol))
+
+    def compare_vals(val1, val2):
+        # walk nested values with a stack of element pair iterators instead of recursing,
+        # comparing elements in the same order and stopping at the first difference
+        stack = [iter(((val1, val2),))]
+        while stack:
+            pair = next(stack[-1], None)
+            if pair is None:
+                stack.pop()
+                continue
+            val1, val2 = pair
+            handler = _compare_vals_handler(type(val1))
+            if handler is None or not isinstance(val2, handler.base):
+                if not val1 == val2:
                     return False
-            else:
-                if val1 != val2:
+            elif handler.nested:
+                pairs = handler.func(val1, val2)
+                if pairs is None:
                     return False
-            return True
+                stack.append(pairs)
+            elif not handler.func(val1, val2, tolerance):
+                return False
+        return True
+
+    if isinstance(actual, list):
+        compare_row_values = compare_vals
+    else:
+        compare_row_values = _row_values_comparator(actual_schema, tolerance, compare_vals)
 
+    def compare_rows(r1: Row, r2: Row):
         if r1 is None and r2 is None:
             return True
         elif r1 is None or r2 is None:
             return False
 
-        return compare_vals(r1, r2)
+        return compare_row_values(r1, r2)
 
     def assert_rows_equal(
         rows1: List[Row], rows2: List[Row], maxErrors: int = None, showOnlyDiff: bool = False
     ):
-        zipped = list(zip_longest(rows1, rows2))
+        # the number of compared row pairs, without materializing the pairs
+        total = max(len(rows1), len(rows2))
         diff_rows_cnt = 0
         diff_rows = []
         has_diff_rows = False
 
-        rows_str1 = ""
-        rows_str2 = ""
+        rows_lines1 = []
+        rows_lines2 = []
 
         # count different rows
-        for r1, r2 in zipped:
+        for r1, r2 in zip_longest(rows1, rows2):
             if not compare_rows(r1, r2):
                 diff_rows_cnt += 1
                 has_diff_rows = True
                 if includeDiffRows:
                     diff_rows.append((r1, r2))
-                rows_str1 += str(r1) + "\n"
-                rows_str2 += str(r2) + "\n"
+                rows_lines1.append(str(r1))
+                rows_lines2.append(str(r2))
                 if maxErrors is not None and diff_rows_cnt >= maxErrors:
                     break
             elif not showOnlyDiff:
-                rows_str1 += str(r1) + "\n"
-                rows_str2 += str(r2) + "\n"
+                rows_lines1.append(str(r1))
+                rows_lines2.append(str(r2))
 
-        generated_diff = _context_diff(
-            actual=rows_str1.splitlines(), expected=rows_str2.splitlines(), n=len(zipped)
-        )
+        generated_diff = _context_diff(actual=rows_lines1, expected=rows_lines2, n=total)
 
         if has_diff_rows:
             error_msg = "Results do not match: "
-            percent_diff = (diff_rows_cnt / len(zipped)) * 100
+            percent_diff = (diff_rows_cnt / total) * 100
             error_msg += "( %.5f %% )" % percent_diff
             error_msg += "\n" + "\n".join(generated_diff)
             data = diff_rows if includeDiffRows else None
@@ -953,41 +1330,101 @@ def assertDataFrameEqual(
 
     # only compare schema if expected is not a List
     if not isinstance(actual, list) and not isinstance(expected, list):
-        if ignoreNullable:
-            assertSchemaEqual(actual.schema, expected.schema)
-        elif actual.schema != expected.schema:
-            generated_diff = difflib.ndiff(
-                str(actual.schema).splitlines(), str(expected.schema).splitlines()
-            )
-            error_msg = "\n".join(generated_diff)
+        if actual_schema == expected_schema:
+            pass
+        elif ignoreNullable:
+            assertSchemaEqual(actual_schema, expected_schema)
+        else:
+            error_msg = _schema_diff(actual_schema, expected_schema)
 
             raise PySparkAssertionError(
                 errorClass="DIFFERENT_SCHEMA",
                 messageParameters={"error_msg": error_msg},
             )
 
-    if not isinstance(actual, list):
-        if actual.isStreaming:
+    for df in (actual, expected):
+        if not isinstance(df, list) and df.isStreaming:
             raise PySparkAssertionError(
                 errorClass="UNSUPPORTED_OPERATION",
                 messageParameters={"operation": "assertDataFrameEqual on streaming DataFrame"},
             )
-        actual_list = actual.collect()
-    else:
-        actual_list = actual
 
-    if not isinstance(expected, list):
-        if expected.isStreaming:
-            raise PySparkAssertionError(
-                errorClass="UNSUPPORTED_OPERATION",
-                messageParameters={"operation": "assertDataFrameEqual on streaming DataFrame"},
-            )
-        expected_list = expected.collect()
+    if (
+        not checkRowOrder
+        and atol == 0
+        and rtol == 0
+        and not isinstance(actual, list)
+        and not isinstance(expected, list)
+        and len(actual_schema.fields) > 0
+        and _supports_exact_jvm_comparison(actual_schema)
+        and _supports_exact_jvm_comparison(expected_schema)
+    ):
+        # Without tolerances the rows can be compared exactly as multisets on the JVM side.
+        # The rows only need to be collected to report a mismatch.
+        if actual.exceptAll(expected).isEmpty() and expected.exceptAll(actual).isEmpty():
+            return
+
+    sort_on_jvm = (
+        not checkRowOrder
+        and not isinstance(actual, list)
+        and not isinstance(expected, list)
+        and len(actual_schema.fields) > 0
+        # columns are sorted by name, which is ambiguous for duplicate column names
+        and len(set(actual_schema.names)) == len(actual_schema.names)
+        and len(set(expected_schema.names)) == len(expected_schema.names)
+        and _supports_exact_jvm_comparison(actual_schema)
+        and _supports_exact_jvm_comparison(expected_schema)
+    )
+    if sort_on_jvm:
+        # sort by all the columns so the rows do not have to be stringified to be sorted on
+        # the driver
+        actual = actual.orderBy(*[_quoted_col(name) for name in actual_schema.names])
+        expected = expected.orderBy(*[_quoted_col(name) for name in expected_schema.names])
+
+    if (
+        checkRowOrder
+        and is_remote()
+        and not isinstance(actual, list)
+        and not isinstance(expected, list)
+    ):
+        # Spark Connect streams the rows of a single execution in Arrow batches, so they are
+        # compared pairwise without holding equal DataFrames in memory at once. This is not
+        # done for classic DataFrames, where toLocalIterator runs one job per partition and
+        # is much slower than collect(). Mismatches are collected below for the error message.
+        actual_rows = actual.toLocalIterator()
+        expected_rows = expected.toLocalIterator()
+        try:
+            if all(compare_rows(r1, r2) for r1, r2 in zip_longest(actual_rows, expected_rows)):
+                return
+        finally:
+            # release both result streams instead of keeping them open until garbage collection
+            actual_rows.close()
+            expected_rows.close()
+
+    if isinstance(actual, list) or isinstance(expected, list):
+        actual_list = actual if isinstance(actual, list) else actual.collect()
+        expected_list = expected if isinstance(expected, list) else expected.collect()
     else:
-        expected_list = expected
-
-    if not checkRowOrder:
-        # rename duplicate columns for sorting
+        # the two collects are independent jobs, run them concurrently
+        executor = _collect_executor()
+        actual_future = executor.submit(_inheritable_collect(actual))
+        expected_future = executor.submit(_inheritable_collect(expected))
+        actual_list = actual_future.result()
+        expected_list = expected_future.result()
+
+    if not checkRowOrder and atol == 0 and rtol == 0:
+        # Without tolerances the rows only have to be equal as multisets, which hashing
+        # checks in linear time. Mismatches still go through the comparison below for the
+        # error message.
+        try:
+            if Counter(actual_list) == Counter(expected_list):
+                return
+        except TypeError:
+            # rows with arrays or maps are not hashable
+            pass
+
+    if not checkRowOrder and not sort_on_jvm:
+        # the rows could not be sorted by Spark, sort them by their string representations
         actual_list = sorted(actual_list, key=lambda x: str(x))
         expected_list = sorted(expected_list, key=lambda x: str(x))
 